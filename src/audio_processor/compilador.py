@@ -1,69 +1,226 @@
 import re
 import os
+import mmap
+import pickle
 import string
-from datetime import datetime
-import collections
-from difflib import get_close_matches
+import argparse
+from datetime import date
+from difflib import SequenceMatcher, get_close_matches
+
+# rapidfuzz (opcional) calcula la distancia de Levenshtein en C++ y permite usar
+# el BK-tree para las sugerencias; sin él se usa difflib.get_close_matches.
+try:
+    from rapidfuzz.distance import Levenshtein as _Levenshtein
+except ImportError:
+    _Levenshtein = None
 
 # --- Definición del Nodo Trie ---
 class TrieNode:
-    def __init__(self):
-        self.children = collections.defaultdict(TrieNode)
+    __slots__ = ('label', 'children', 'is_end_of_word')
+
+    def __init__(self, label=""):
+        # Trie comprimido (radix): cada arista guarda una subcadena completa
+        # en lugar de un solo carácter. Los hijos se indexan por su primer carácter.
+        self.label = label
+        self.children = {}
         self.is_end_of_word = False
 
-# --- Estructura de Datos Trie ---
+# --- Estructura de Datos Trie (radix / PATRICIA) ---
 class Trie:
     def __init__(self):
         self.root = TrieNode()
+        self._sorted_words = None # Caché de get_sorted_words()
+        self._bk_tree = None # Caché de get_bk_tree()
 
     def insert(self, word):
+        self._sorted_words = None
+        self._bk_tree = None
         node = self.root
-        for char in word:
-            node = node.children[char]
+        i = 0
+        while i < len(word):
+            child = node.children.get(word[i])
+            if child is None:
+                # No hay arista que empiece por este carácter: se cuelga el resto de la palabra
+                nuevo = TrieNode(word[i:])
+                nuevo.is_end_of_word = True
+                node.children[word[i]] = nuevo
+                return
+            label = child.label
+            comun = 0
+            while comun < len(label) and i + comun < len(word) and label[comun] == word[i + comun]:
+                comun += 1
+            if comun < len(label):
+                # La palabra diverge a mitad de la arista: se parte en dos
+                intermedio = TrieNode(label[:comun])
+                node.children[word[i]] = intermedio
+                child.label = label[comun:]
+                intermedio.children[child.label[0]] = child
+                child = intermedio
+            node = child
+            i += comun
         node.is_end_of_word = True
 
     def search(self, word):
         node = self.root
-        for char in word:
-            if char not in node.children:
+        i = 0
+        while i < len(word):
+            node = node.children.get(word[i])
+            if node is None or not word.startswith(node.label, i):
                 return False
-            node = node.children[char]
+            i += len(node.label)
         return node.is_end_of_word
 
     def starts_with(self, prefix):
         node = self.root
-        for char in prefix:
-            if char not in node.children:
+        i = 0
+        while i < len(prefix):
+            node = node.children.get(prefix[i])
+            if node is None:
                 return False
-            node = node.children[char]
+            resto = prefix[i:]
+            if len(resto) <= len(node.label):
+                # El prefijo termina dentro de esta arista
+                return node.label.startswith(resto)
+            if not prefix.startswith(node.label, i):
+                return False
+            i += len(node.label)
         return True
 
-    # Método para obtener todas las palabras en el Trie
-    def get_all_words(self, node=None, prefix="", words=None):
-        if node is None:
-            node = self.root
-        if words is None:
-            words = []
-
-        if node.is_end_of_word:
-            words.append(prefix)
+    # Genera las palabras del Trie una a una (recorrido iterativo con pila explícita),
+    # sin materializar la lista completa
+    def iter_words(self):
+        stack = [(self.root, [])]
+        while stack:
+            node, labels = stack.pop()
+            if node.is_end_of_word:
+                yield "".join(labels)
+            # Se apilan en orden inverso para conservar el orden de inserción
+            for child_node in reversed(node.children.values()):
+                stack.append((child_node, labels + [child_node.label]))
 
-        for char, child_node in node.children.items():
-            self.get_all_words(child_node, prefix + char, words)
-        return words
+    # Método para obtener todas las palabras en el Trie
+    def get_all_words(self):
+        return list(self.iter_words())
+
+    # Palabras ordenadas alfabéticamente; se calcula una vez y se invalida al insertar
+    def get_sorted_words(self):
+        if self._sorted_words is None:
+            self._sorted_words = tuple(sorted(self.iter_words()))
+        return self._sorted_words
+
+    # BK-tree de las palabras del Trie; se construye la primera vez que hace falta
+    # una sugerencia y se invalida al insertar
+    def get_bk_tree(self):
+        if self._bk_tree is None:
+            self._bk_tree = BKTree(self.get_sorted_words())
+        return self._bk_tree
 
     def print_all_words(self):
             
             print("\n--- Palabras en el Trie ---")
-            words = self.get_all_words() # Reutilizamos el método existente
+            words = self.get_sorted_words() # Reutilizamos la lista ya ordenada
             if not words:
                 print("El Trie está vacío.")
                 return
 
-            for word in sorted(words): # Opcional: ordenar alfabéticamente
+            for word in words:
                 print(word)
             print("---------------------------")
 
+# --- BK-tree para búsqueda aproximada por distancia de edición ---
+# Solo se usa con rapidfuzz instalado: con una distancia en Python puro el
+# BK-tree resulta más lento que difflib.get_close_matches.
+class BKTree:
+    def __init__(self, words=()):
+        # Cada nodo es (palabra, {distancia: nodo_hijo})
+        self.root = None
+        for word in words:
+            self.add(word)
+
+    def add(self, word):
+        if self.root is None:
+            self.root = (word, {})
+            return
+        node = self.root
+        while True:
+            palabra, hijos = node
+            d = _Levenshtein.distance(word, palabra)
+            if d == 0:
+                return
+            hijo = hijos.get(d)
+            if hijo is None:
+                hijos[d] = (word, {})
+                return
+            node = hijo
+
+    def query(self, word, max_dist):
+        """Devuelve una lista de (distancia, palabra) con distancia <= max_dist."""
+        resultados = []
+        if self.root is None:
+            return resultados
+        pendientes = [self.root]
+        while pendientes:
+            palabra, hijos = pendientes.pop()
+            d = _Levenshtein.distance(word, palabra)
+            if d <= max_dist:
+                resultados.append((d, palabra))
+            # Desigualdad triangular: solo interesan hijos en [d - max_dist, d + max_dist]
+            for dist_hijo, hijo in hijos.items():
+                if d - max_dist <= dist_hijo <= d + max_dist:
+                    pendientes.append(hijo)
+        return resultados
+
+# Palabras clave de tipos de datos que no se insertan en el Trie
+_PALABRAS_TIPO_DATO = frozenset({
+    "int", "integer", "float", "double", "string", "char", "boolean",
+    "bool", "void", "long", "short", "byte", "decimal", "date", "time",
+    "datetime", "array", "list", "dict", "dictionary", "set", "tuple",
+    "object", "class"
+})
+
+_PUNTUACION = re.escape(string.punctuation)
+
+# Palabra del esquema: bloque delimitado por espacios o '#', sin la puntuación
+# de los extremos (p. ej. "clave_primaria" se conserva entera).
+_PALABRA_ESQUEMA_RE = re.compile(rf"[^\s{_PUNTUACION}](?:[^\s#]*[^\s{_PUNTUACION}])?")
+
+# Se incrementa si cambia el formato de la caché para invalidar cachés antiguas
+_VERSION_CACHE_TRIE = 2
+
+# La caché guarda solo tuplas, cadenas y booleanos: (etiqueta, fin_de_palabra, hijos).
+# Así no depende de la ruta de la clase Trie (que sería '__main__.Trie' al ejecutar
+# el script y 'compilador.Trie' al importarlo).
+def _nodo_a_tuplas(node):
+    return (node.label, node.is_end_of_word, tuple(_nodo_a_tuplas(hijo) for hijo in node.children.values()))
+
+def _tuplas_a_nodo(datos):
+    label, is_end_of_word, hijos = datos
+    node = TrieNode(label)
+    node.is_end_of_word = is_end_of_word
+    for datos_hijo in hijos:
+        hijo = _tuplas_a_nodo(datos_hijo)
+        node.children[hijo.label[0]] = hijo
+    return node
+
+def _cargar_trie_cache(ruta_cache, clave):
+    try:
+        with open(ruta_cache, 'rb') as f:
+            clave_guardada, datos = pickle.load(f)
+        if clave_guardada != clave:
+            return None
+        trie = Trie()
+        trie.root = _tuplas_a_nodo(datos)
+    except Exception:
+        return None # Caché inexistente, corrupta o de otra versión: se reconstruye
+    return trie
+
+def _guardar_trie_cache(ruta_cache, clave, trie):
+    try:
+        with open(ruta_cache, 'wb') as f:
+            pickle.dump((clave, _nodo_a_tuplas(trie.root)), f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError as e:
+        print(f"Aviso: no se pudo guardar la caché del Trie en '{ruta_cache}': {e}")
+
 # --- Función para Generar el Conjunto de Datos y Construir el Trie ---
 def generate_dataset_and_trie(file_path):
     """
@@ -71,38 +228,46 @@ def generate_dataset_and_trie(file_path):
     excluyendo palabras clave comunes de tipos de datos, y las almacena en un Trie.
     Ahora también separa las palabras que contienen '#'.
 
+    El Trie construido se guarda en '<file_path>.cache' junto con la fecha de
+    modificación y el tamaño del archivo; mientras estos no cambien, las siguientes
+    ejecuciones lo cargan de la caché en lugar de volver a procesar el archivo.
+
     Args:
         file_path (str): La ruta al archivo de texto de entrada.
 
     Returns:
         Trie: Un Trie que contiene las palabras únicas del archivo.
     """
-    data_type_keywords = {
-        "int", "integer", "float", "double", "string", "char", "boolean",
-        "bool", "void", "long", "short", "byte", "decimal", "date", "time",
-        "datetime", "array", "list", "dict", "dictionary", "set", "tuple",
-        "object", "class"
-    }
-
+    try:
+        estado = os.stat(file_path)
+        clave = (_VERSION_CACHE_TRIE, estado.st_mtime_ns, estado.st_size)
+    except OSError:
+        clave = None # El error se informa al intentar abrir el archivo
+    ruta_cache = file_path + '.cache'
+
+    trie = _cargar_trie_cache(ruta_cache, clave) if clave is not None else None
+    if trie is None:
+        trie = _construir_trie(file_path)
+        if trie is None:
+            return None
+        if clave is not None:
+            _guardar_trie_cache(ruta_cache, clave, trie)
+    return trie
+
+def _construir_trie(file_path):
     unique_words_trie = Trie()
     processed_words = set()
 
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
             for line in f:
-                # Modificación: Usamos re.split para dividir por espacios y por '#'
-                # Esto manejará casos como "palabra#otra_palabra" o "palabra # otra"
-                words_in_line = re.split(r'\s+|#', line.lower())
-                
-                for word in words_in_line:
-                    cleaned_word = word.strip(string.punctuation).strip() # Limpiar puntuación y espacios extra
-                    
-                    if cleaned_word and cleaned_word not in data_type_keywords and cleaned_word not in processed_words:
-                        # Si la palabra todavía contiene '#', se asegura de que se haya manejado o se inserte
-                        # Si usamos re.split(r'\s+|#', ...), ya deberían estar separadas.
-                        # Este bloque asegura que solo palabras válidas y únicas se inserten.
-                        unique_words_trie.insert(cleaned_word)
-                        processed_words.add(cleaned_word)
+                # Una sola pasada por línea: separa por espacios y por '#' y descarta
+                # la puntuación de los extremos de cada palabra
+                for word in _PALABRA_ESQUEMA_RE.findall(line.lower()):
+                    if word in _PALABRAS_TIPO_DATO or word in processed_words:
+                        continue
+                    processed_words.add(word)
+                    unique_words_trie.insert(word)
     except FileNotFoundError:
         print(f"Error: El archivo '{file_path}' no fue encontrado.")
         return None
@@ -120,85 +285,100 @@ FORMATOS_FECHA = [ #
     r"\d{1,2} de [a-z]+ de \d{4}"      # 21 de julio de 2025
 ]
 
+# Una única alternancia, compilada al cargar el módulo, para validar cualquier formato con un solo fullmatch
+_FECHA_RE = re.compile("|".join(f"(?:{p})" for p in FORMATOS_FECHA)) #
+
 def es_fecha(texto): #
-    texto = texto.lower() #
-    for formato in FORMATOS_FECHA: #
-        if re.fullmatch(formato, texto): #
-            return True #
-    return False #
+    # Todos los formatos empiezan por un dígito: se descarta el resto de tokens sin usar la regex
+    if not texto[:1].isdecimal(): #
+        return False #
+    return _FECHA_RE.fullmatch(texto.lower()) is not None #
+
+# La fecha más larga ocupa 5 tokens: "21 de julio de 2025"
+_MAX_TOKENS_FECHA = 5 #
 
 def unir_fecha(tokens, inicio): #
-    partes = [] #
-    i = inicio #
-    while i < len(tokens): #
-        partes.append(tokens[i][1]) #
-        posible_fecha = ' '.join(partes) #
+    fin_maximo = min(inicio + _MAX_TOKENS_FECHA, len(tokens)) #
+    for fin in range(inicio + 1, fin_maximo + 1): #
+        posible_fecha = ' '.join(t[1] for t in tokens[inicio:fin]) #
         if es_fecha(posible_fecha): #
-            return posible_fecha, i - inicio + 1 #
-        i += 1 #
+            return posible_fecha, fin - inicio #
     return None, 0 #
 
 # === Análisis Léxico ===
-def analisis_lexico(texto): #
-    texto = texto.lower() #
-    palabras = texto.split() #
-    palabras = [p.strip(string.punctuation) for p in palabras if p.strip(string.punctuation)] #
-
-    acciones = { #
-        "muéstrame", "muestrame", "mostrar", "muestra", "dame", "dámelos", "dámelas",
-        "enséñame", "ensename", "quiero", "consultar", "consulta", "ver", "visualizar",
-        "verifica", "explora", "lista", "listar", "recupera", "recuperar", "busca",
-        "buscar", "obtén", "obtener", "extrae", "extraer", "filtra", "filtrar",
-        "accede", "acceder", "selecciona", "seleccionar", "deseo", "necesito"
-    }
-
-    cuantificadores = { #
-        "todos", "todas", "los", "las", "algunos", "algunas", "ninguno", "ninguna",
-        "cada", "varios", "cualquier", "cualquiera", "muchos", "muchas", "pocos", "pocas",
-        "uno", "una", "el", "la", "este", "esta", "estos", "estas"
-    }
+# Un token es un bloque sin espacios sin la puntuación de los extremos
+# (equivale a split() + strip(string.punctuation), pero en una sola pasada).
+# La puntuación interna se conserva: "2025-07-21", "21/07/2025", "10.5".
+_TOKEN_RE = re.compile(rf"[^\s{_PUNTUACION}](?:\S*[^\s{_PUNTUACION}])?") #
+
+_ACCIONES = frozenset({ #
+    "muéstrame", "muestrame", "mostrar", "muestra", "dame", "dámelos", "dámelas",
+    "enséñame", "ensename", "quiero", "consultar", "consulta", "ver", "visualizar",
+    "verifica", "explora", "lista", "listar", "recupera", "recuperar", "busca",
+    "buscar", "obtén", "obtener", "extrae", "extraer", "filtra", "filtrar",
+    "accede", "acceder", "selecciona", "seleccionar", "deseo", "necesito"
+})
+
+_CUANTIFICADORES = frozenset({ #
+    "todos", "todas", "los", "las", "algunos", "algunas", "ninguno", "ninguna",
+    "cada", "varios", "cualquier", "cualquiera", "muchos", "muchas", "pocos", "pocas",
+    "uno", "una", "el", "la", "este", "esta", "estos", "estas"
+})
+
+_CONECTORES = frozenset({ #
+    "que", "donde", "cuyo", "cuyos", "cual", "cuales", "si", "cuando", "mientras",
+    "aunque", "y", "o"
+})
+
+_OPERADORES = frozenset({"=", ">", "<", ">=", "<=", "!=", "<>"}) #
+
+_INDICADORES_ENTIDAD = frozenset({"tabla", "tablas", "base", "bases", "entidad", "entidades"}) #
+
+_INDICADORES_ATRIBUTO = frozenset({"columna", "columnas", "campo", "campos", "atributo", "atributos"}) #
+
+_TABLAS_VALIDAS = frozenset({"clientes", "productos", "ventas"}) #
+
+_ATRIBUTOS_VALIDOS = frozenset({"nombre", "edad", "id", "dept", "precio", "fecha"}) #
+
+_VERBOS_LLAMADO = frozenset({"llamado", "llamados", "llamada"}) #
+
+# Palabra -> tipo de token. Se recorre en orden de prioridad: la primera categoría gana.
+_CATEGORIA = {} #
+for _conjunto, _tipo in ( #
+    (_ACCIONES, "ACCION"),
+    (_CUANTIFICADORES, "CUANTIFICADOR"),
+    (_CONECTORES, "CONECTOR"),
+    (_OPERADORES, "OPERADOR"),
+    (_INDICADORES_ENTIDAD, "INDICADOR_ENTIDAD"),
+    (_INDICADORES_ATRIBUTO, "INDICADOR_ATRIBUTO"),
+):
+    for _palabra in _conjunto: #
+        _CATEGORIA.setdefault(_palabra, _tipo) #
+del _conjunto, _tipo, _palabra #
 
-    conectores = { #
-        "que", "donde", "cuyo", "cuyos", "cual", "cuales", "si", "cuando", "mientras",
-        "aunque", "y", "o"
-    }
-
-    operadores = {"=", ">", "<", ">=", "<=", "!=", "<>"} #
-
-    tokens = [] #
-    for palabra in palabras: #
-        if palabra in acciones: #
-            tokens.append(("ACCION", palabra)) #
-        elif palabra in cuantificadores: #
-            tokens.append(("CUANTIFICADOR", palabra)) #
-        elif palabra in conectores: #
-            tokens.append(("CONECTOR", palabra)) #
-        elif palabra in operadores: #
-            tokens.append(("OPERADOR", palabra)) #
-        elif palabra in {"tabla", "tablas", "base", "bases", "entidad", "entidades"}: #
-            tokens.append(("INDICADOR_ENTIDAD", palabra)) #
-        elif palabra in {"columna", "columnas", "campo", "campos", "atributo", "atributos"}: #
-            tokens.append(("INDICADOR_ATRIBUTO", palabra)) #
-        else:
-            tokens.append(("PALABRA", palabra)) #
-    return tokens #
+def analisis_lexico(texto): #
+    palabras = _TOKEN_RE.findall(texto.lower()) #
+    return [(_CATEGORIA.get(palabra, "PALABRA"), palabra) for palabra in palabras] #
+
+# Frases de operadores compuestos y su símbolo equivalente
+_OP_MAP = { #
+    "mayor o igual que": ">=",
+    "menor o igual que": "<=",
+    "mayor que": ">",
+    "menor que": "<",
+    "menor a": "<",
+    "igual a": "=",
+    "igual": "=",
+    "no es": "!=",
+    "diferente de": "!="
+}
+# Una sola alternancia; las frases más largas van primero para que ganen
+_OP_RE = re.compile( #
+    r'\b(' + '|'.join(re.escape(frase) for frase in sorted(_OP_MAP, key=len, reverse=True)) + r')\b'
+)
 
 def _reemplazar_operadores_compuestos(texto): #
-    texto = texto.lower() #
-    mapeo = { #
-        "mayor o igual que": ">=",
-        "menor o igual que": "<=",
-        "mayor que": ">",
-        "menor que": "<",
-        "menor a": "<",
-        "igual a": "=",
-        "igual": "=",
-        "no es": "!=",
-        "diferente de": "!="
-    }
-    for frase, reemplazo in mapeo.items(): #
-        texto = re.sub(r'\b' + re.escape(frase) + r'\b', reemplazo, texto) #
-    return texto #
+    return _OP_RE.sub(lambda m: _OP_MAP[m.group(1)], texto.lower()) #
 
 # === Análisis Sintáctico ===
 def analisis_sintactico(tokens): #
@@ -244,9 +424,9 @@ def analisis_sintactico(tokens): #
                 i += 1 #
 
         elif tipo == "PALABRA" and estructura["entidad"] is None: #
-            if valor in {"clientes", "productos", "ventas"}:  # tablas válidas
+            if valor in _TABLAS_VALIDAS:  # tablas válidas
                 estructura["entidad"] = valor #
-            elif valor in {"nombre", "edad", "id", "dept", "precio", "fecha"}:  # atributos válidos
+            elif valor in _ATRIBUTOS_VALIDOS:  # atributos válidos
                 estructura.setdefault("atributos_mostrar", []).append(valor) #
 
 
@@ -261,7 +441,7 @@ def analisis_sintactico(tokens): #
                     atributo = tokens[j][1] #
                     operador_compuesto = f"{tokens[j+1][1]} {tokens[j+2][1]}" #
                     operador_normalizado = _reemplazar_operadores_compuestos(operador_compuesto) #
-                    if operador_normalizado in {"=", ">", "<", ">=", "<=", "!=", "<>"}: #
+                    if operador_normalizado in _OPERADORES: #
                         if j + 3 < len(tokens): #
                             estructura["condiciones"].append({ #
                                 "atributo": atributo,
@@ -280,7 +460,7 @@ def analisis_sintactico(tokens): #
             operador = _reemplazar_operadores_compuestos(posible_operador) #
             valor_c = tokens[i+4][1] #
 
-            if operador in {"=", ">", "<", ">=", "<=", "!=", "<>"}: #
+            if operador in _OPERADORES: #
                 estructura["condiciones"].append({ #
                     "atributo": atributo,
                     "operador": operador,
@@ -296,13 +476,13 @@ def analisis_sintactico(tokens): #
                     estructura["condiciones"].append({ #
                         "atributo": "dept",
                         "operador": "=",
-                        "valor": tokens[i+1][1].rstrip(".")
+                        "valor": tokens[i+1][1] # El léxico ya quitó la puntuación final
                     })
                     i += 1 #
 
         
             # Ej: "cliente llamado Lucia" o "cliente llamada Lucia"
-        elif valor in {"llamado","llamados", "llamada"} and i > 0 and tokens[i-1][0] == "PALABRA": #
+        elif valor in _VERBOS_LLAMADO and i > 0 and tokens[i-1][0] == "PALABRA": #
             if estructura["entidad"] is None: #
                 estructura["entidad"] = tokens[i-1][1] #
             if i + 1 < len(tokens): #
@@ -357,6 +537,14 @@ def generar_lenguaje_natural_final(estructura, condiciones_ln): #
     return consulta + "." #
 
 # === Generar SQL ===
+# Meses en español; no depende del locale (LC_TIME) como strptime con %B
+_MESES = { #
+    "enero": 1, "febrero": 2, "marzo": 3, "abril": 4, "mayo": 5, "junio": 6,
+    "julio": 7, "agosto": 8, "septiembre": 9, "setiembre": 9, "octubre": 10,
+    "noviembre": 11, "diciembre": 12
+}
+_FECHA_LARGA_RE = re.compile(r"(\d{1,2}) de ([a-z]+) de (\d{4})") #
+
 def generar_sql(estructura): #
     if not estructura["entidad"]: #
         return "-- No se puede generar consulta SQL: entidad desconocida." #
@@ -374,12 +562,14 @@ def generar_sql(estructura): #
         valor = cond["valor"] #
 
         # Conversión de fecha con formato largo
-        if atributo == "fecha" and re.match(r"\d{1,2} de [a-z]+ de \d{4}", valor): #
-            try:
-                fecha_obj = datetime.strptime(valor, "%d de %B de %Y") #
-                valor = fecha_obj.strftime("%Y-%m-%d") #
-            except:
-                pass #
+        fecha_larga = _FECHA_LARGA_RE.fullmatch(valor) if atributo == "fecha" else None #
+        if fecha_larga: #
+            dia, mes, anio = fecha_larga.groups() #
+            if mes in _MESES: #
+                try:
+                    valor = date(int(anio), _MESES[mes], int(dia)).isoformat() #
+                except ValueError:
+                    pass # Día fuera de rango: se deja el texto original
             condiciones.append(f"{atributo} {operador} DATE('{valor}')") #
         else:
             if valor.replace(".", "", 1).isdigit(): #
@@ -392,7 +582,34 @@ def generar_sql(estructura): #
     return sql  #
 
 # === Función de Revisión y Sugerencia ===
-def revisar_y_sugerir_traduccion(sql_query, estructura, diccionario_valido_trie, original_text):
+# Similitud normalizada mínima (0-1) para ofrecer una sugerencia, igual en ambos motores
+_SIMILITUD_MINIMA_SUGERENCIA = 0.6
+# Similitud mínima para aplicar una sugerencia sin preguntar (modo por lotes):
+# admite una edición en palabras de 4 o más letras y dos a partir de 8
+_SIMILITUD_MINIMA_AUTOCORRECCION = 0.75
+
+def _sugerencias_con_costo(palabra, diccionario_valido_trie, n=5):
+    """Devuelve hasta n pares (costo, sugerencia) ordenados; menor costo = más cercana.
+
+    El costo es la similitud normalizada negada: 1 - distancia / longitud mayor
+    (Levenshtein.normalized_similarity) con rapidfuzz, o el ratio de difflib sin él.
+    """
+    # Con rapidfuzz se usa el BK-tree (creado solo cuando hace falta); sin él, difflib
+    if _Levenshtein is not None:
+        bk_tree = diccionario_valido_trie.get_bk_tree()
+        # similitud >= 0.6 implica distancia <= 0.4 * longitud mayor, y como la sugerencia
+        # mide como mucho len(palabra) + distancia, basta buscar hasta 2/3 de len(palabra)
+        pares = []
+        for distancia, sugerencia in bk_tree.query(palabra, len(palabra) * 2 // 3):
+            similitud = 1 - distancia / max(len(palabra), len(sugerencia), 1)
+            if similitud >= _SIMILITUD_MINIMA_SUGERENCIA:
+                pares.append((-similitud, sugerencia))
+        return sorted(pares)[:n]
+    sugerencias = get_close_matches(palabra, diccionario_valido_trie.get_sorted_words(), n=n, cutoff=_SIMILITUD_MINIMA_SUGERENCIA)
+    # Mismo orden y puntuación que get_close_matches, negada para que menor sea mejor
+    return [(-SequenceMatcher(None, sugerencia, palabra).ratio(), sugerencia) for sugerencia in sugerencias]
+
+def revisar_y_sugerir_traduccion(sql_query, estructura, diccionario_valido_trie, original_text, interactivo=True):
     """
     Revisa la consulta SQL generada y la estructura sintáctica en busca de entidades
     o atributos que no coincidan exactamente con el diccionario válido (Trie).
@@ -403,12 +620,14 @@ def revisar_y_sugerir_traduccion(sql_query, estructura, diccionario_valido_trie,
         estructura (dict): La estructura sintáctica analizada.
         diccionario_valido_trie (Trie): Un Trie que contiene todas las tablas y columnas válidas.
         original_text (str): El texto original en lenguaje natural.
+        interactivo (bool, opcional): Si es False no se pregunta al usuario (modo por
+            lotes): se aplica la sugerencia más cercana solo si no está empatada con
+            otra y su similitud alcanza _SIMILITUD_MINIMA_AUTOCORRECCION; cada
+            corrección automática se informa por pantalla.
 
     Returns:
         str: La consulta SQL revisada y potencialmente modificada.
     """
-    todas_palabras_validas = diccionario_valido_trie.get_all_words()
-    
     # Lista para almacenar las revisiones necesarias
     revisiones = []
 
@@ -457,14 +676,13 @@ def revisar_y_sugerir_traduccion(sql_query, estructura, diccionario_valido_trie,
     print(f"Consulta SQL generada inicialmente: '{sql_query}'")
     print("\n⚠️ Se encontraron posibles inconsistencias con las tablas/columnas válidas.")
 
-    nueva_sql_query = sql_query # Copia para modificar
-
     for rev in revisiones:
         palabra_a_revisar = rev["original"]
         print(f"\nLa palabra '{palabra_a_revisar}' no parece ser una tabla o columna válida.")
         
-        # Obtener sugerencias de palabras cercanas
-        sugerencias = get_close_matches(palabra_a_revisar, todas_palabras_validas, n=5, cutoff=0.6)
+        # Obtener sugerencias de palabras cercanas, de la más cercana a la más lejana
+        sugerencias_con_costo = _sugerencias_con_costo(palabra_a_revisar, diccionario_valido_trie)
+        sugerencias = [palabra for _, palabra in sugerencias_con_costo]
         
         opciones = [palabra_a_revisar] + sugerencias
         
@@ -473,6 +691,21 @@ def revisar_y_sugerir_traduccion(sql_query, estructura, diccionario_valido_trie,
             print(f"  {idx + 1}. {opcion}")
         
         seleccion = -1
+        if not interactivo:
+            # Sin usuario solo se corrige si hay una única sugerencia más cercana y es
+            # suficientemente parecida; si no, se conserva la palabra original.
+            costos = [costo for costo, _ in sugerencias_con_costo]
+            seleccion = 1
+            if not costos:
+                print(f"⚠️ Sin sugerencias: se conserva '{palabra_a_revisar}'.")
+            elif costos.count(costos[0]) > 1:
+                empatadas = ", ".join(opciones[1:1 + costos.count(costos[0])])
+                print(f"⚠️ Sugerencias empatadas ({empatadas}): se conserva '{palabra_a_revisar}'.")
+            elif -costos[0] < _SIMILITUD_MINIMA_AUTOCORRECCION:
+                print(f"⚠️ La sugerencia '{opciones[1]}' no es lo bastante parecida: se conserva '{palabra_a_revisar}'.")
+            else:
+                seleccion = 2
+                print(f"⚠️ Corrección automática: '{palabra_a_revisar}' -> '{opciones[1]}'.")
         while seleccion < 1 or seleccion > len(opciones):
             try:
                 seleccion_str = input(f"Por favor, elige la opción correcta para '{palabra_a_revisar}' (1-{len(opciones)}): ")
@@ -484,39 +717,25 @@ def revisar_y_sugerir_traduccion(sql_query, estructura, diccionario_valido_trie,
         
         palabra_elegida = opciones[seleccion - 1]
         
-        # Actualizar la estructura y la consulta SQL con la palabra elegida
+        # Solo se actualiza la estructura; la SQL se regenera una vez al final
         if rev["tipo"] == "entidad":
-            # Si el usuario eligió una nueva entidad, reemplazamos en la estructura y en la SQL
             old_entity = estructura["entidad"]
             estructura["entidad"] = palabra_elegida
-            # Esto es una simplificación, una regex más robusta sería ideal para la SQL
-            nueva_sql_query = nueva_sql_query.replace(f"FROM {old_entity}", f"FROM {palabra_elegida}")
-            print(f"'{old_entity}' se actualizó a '{palabra_elegida}' en la estructura y SQL.")
+            print(f"'{old_entity}' se actualizó a '{palabra_elegida}' en la estructura.")
         
         elif rev["tipo"] == "atributo_mostrar":
             old_attr = estructura["atributos_mostrar"][rev["indice"]]
             estructura["atributos_mostrar"][rev["indice"]] = palabra_elegida
-            # Reemplazar solo la primera ocurrencia en SELECT para evitar problemas
-            # Esto asume que el atributo está en la cláusula SELECT directamente
-            # Un parseo de SQL más profundo sería mejor para casos complejos
-            nueva_sql_query = re.sub(r'\b' + re.escape(old_attr) + r'\b', palabra_elegida, nueva_sql_query, 1)
-            print(f"'{old_attr}' se actualizó a '{palabra_elegida}' en la estructura y SQL.")
+            print(f"'{old_attr}' se actualizó a '{palabra_elegida}' en la estructura.")
 
         elif rev["tipo"] == "atributo_condicion":
             old_attr = estructura["condiciones"][rev["indice"]][rev["sub_campo"]]
             estructura["condiciones"][rev["indice"]][rev["sub_campo"]] = palabra_elegida
-            # Buscar y reemplazar en la cláusula WHERE
-            # Esto es más complejo ya que el atributo está en una condición
-            # Una forma simple es buscar la cadena completa de la condición
-            # y recrearla, o hacer un reemplazo basado en la estructura
-            # Para este ejemplo, intentaremos un reemplazo simple que podría fallar en casos complejos
-            # La mejor forma sería regenerar la SQL después de las actualizaciones de la estructura.
-            
-            # Regenerar la SQL después de cada cambio en la estructura es lo más seguro
-            # para mantener la coherencia.
-            nueva_sql_query = generar_sql(estructura) 
-            print(f"'{old_attr}' se actualizó a '{palabra_elegida}' en la estructura y se regeneró la SQL.")
+            print(f"'{old_attr}' se actualizó a '{palabra_elegida}' en la estructura.")
 
+    # Regenerar la SQL a partir de la estructura corregida mantiene la coherencia
+    # entre SELECT, FROM y WHERE sin reemplazos de texto frágiles.
+    nueva_sql_query = generar_sql(estructura)
 
     print("\n--- Revisión Completa ---")
     print(f"Consulta SQL final después de la revisión: '{nueva_sql_query}'")
@@ -543,8 +762,49 @@ def compilador_nl2sql_texto(texto): #
 
     return consulta_sql, estructura # Ahora devuelve la SQL y la estructura
 
+# === Lectura de transcripciones ===
+def leer_transcripcion(ruta):
+    """Lee un archivo de transcripción mapeándolo en memoria y decodificando directamente
+    desde el mapeo, sin copiarlo antes a un objeto bytes. Los saltos de línea de Windows
+    se normalizan como haría open() en modo texto."""
+    with open(ruta, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return "" # mmap no admite archivos vacíos
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # La vista debe liberarse antes de cerrar el mapeo
+            with memoryview(mm) as vista:
+                return str(vista, "utf-8").replace("\r\n", "\n").strip()
+
+# === Procesamiento por lotes ===
+def procesar_lote(rutas, diccionario_valido_trie=None, interactivo=False):
+    """
+    Traduce varias transcripciones reutilizando el Trie, el BK-tree y las regex ya
+    compiladas, de modo que los costes fijos se pagan una sola vez para todo el lote.
+
+    Args:
+        rutas (iterable): Rutas a los archivos de transcripción.
+        diccionario_valido_trie (Trie, opcional): Tablas y columnas válidas para la revisión.
+        interactivo (bool, opcional): Si es True se pregunta al usuario en cada corrección.
+
+    Yields:
+        tuple: (ruta, consulta SQL final) para cada archivo.
+    """
+    for ruta in rutas:
+        texto = leer_transcripcion(ruta)
+        sql, estructura = compilador_nl2sql_texto(texto)
+        if diccionario_valido_trie:
+            sql = revisar_y_sugerir_traduccion(sql, estructura, diccionario_valido_trie, texto, interactivo)
+        yield ruta, sql
+
 # === Main ===
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compilador de lenguaje natural a SQL.")
+    parser.add_argument("archivos", nargs="*",
+                        help="Transcripciones a procesar por lotes (por defecto se usa transcripcion.txt).")
+    parser.add_argument("--interactive", action="store_true",
+                        help="En modo por lotes, preguntar al usuario en cada corrección.")
+    args = parser.parse_args()
+
     nombre_archivo_transcripcion = "transcripcion.txt" #
     
     input_db_schema_file = "relaciones_tablas.txt" 
@@ -575,24 +835,31 @@ if __name__ == "__main__":
         diccionario_valido_trie.print_all_words()
         # --- FIN DE LA LLAMADA ---
 
-    if os.path.exists(nombre_archivo_transcripcion): #
-        with open(nombre_archivo_transcripcion, "r", encoding="utf-8") as f: #
-            contenido_original = f.read().strip()
+    if args.archivos:
+        # Modo por lotes: una consulta SQL por línea, en el mismo orden que los archivos
+        with open(nombre_archivo_para_gestor, "w", encoding="utf-8") as f: #
+            for ruta, sql_final in procesar_lote(args.archivos, diccionario_valido_trie, args.interactive):
+                f.write(sql_final + "\n")
+                print(f"\n[{ruta}] {sql_final}")
+        print(f"\nConsultas SQL del lote guardadas en: {nombre_archivo_para_gestor}") #
     else:
-        print("⚠ No se encontró el archivo. Usando consulta de ejemplo.") #
-        contenido_original = "muéstrame las bontas que se realizaron en 21 de julio de 2025 donde la edat es mayor a 30"
-        # Ejemplo con errores intencionales: "bontas" en lugar de "ventas", "edat" en lugar de "edad"
-        # También puedes probar: "muéstrame el nombe de los cliontes"
+        if os.path.exists(nombre_archivo_transcripcion): #
+            contenido_original = leer_transcripcion(nombre_archivo_transcripcion)
+        else:
+            print("⚠ No se encontró el archivo. Usando consulta de ejemplo.") #
+            contenido_original = "muéstrame las bontas que se realizaron en 21 de julio de 2025 donde la edat es mayor a 30"
+            # Ejemplo con errores intencionales: "bontas" en lugar de "ventas", "edat" en lugar de "edad"
+            # También puedes probar: "muéstrame el nombe de los cliontes"
 
-    sql_generado, estructura_sintactica = compilador_nl2sql_texto(contenido_original) # Captura la estructura
+        sql_generado, estructura_sintactica = compilador_nl2sql_texto(contenido_original) # Captura la estructura
 
-    if diccionario_valido_trie:
-        sql_final = revisar_y_sugerir_traduccion(sql_generado, estructura_sintactica, diccionario_valido_trie, contenido_original)
-    else:
-        sql_final = sql_generado
-        print("\nNo se pudo cargar el diccionario de tablas/columnas válidas. No se realizó la revisión interactiva.")
+        if diccionario_valido_trie:
+            sql_final = revisar_y_sugerir_traduccion(sql_generado, estructura_sintactica, diccionario_valido_trie, contenido_original)
+        else:
+            sql_final = sql_generado
+            print("\nNo se pudo cargar el diccionario de tablas/columnas válidas. No se realizó la revisión interactiva.")
 
-    # Guardar la consulta SQL final (después de la revisión)
-    with open(nombre_archivo_para_gestor, "w", encoding="utf-8") as f: #
-        f.write(sql_final)
-    print(f"\nConsulta SQL final (revisada) guardada en: {nombre_archivo_para_gestor}") #
\ No newline at end of file
+        # Guardar la consulta SQL final (después de la revisión)
+        with open(nombre_archivo_para_gestor, "w", encoding="utf-8") as f: #
+            f.write(sql_final)
+        print(f"\nConsulta SQL final (revisada) guardada en: {nombre_archivo_para_gestor}") #
\ No newline at end of file
@@ -1,21 +1,52 @@
-import whisper
+import functools
 import os
 
 ruta_audio = "grabacion.wav"
 
+def _dispositivo_torch():
+    # openai-whisper corre sobre torch: se usa la GPU (FP16) si torch ve CUDA.
+    try:
+        import torch
+    except ImportError:
+        return "cpu"
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+def _dispositivo_ctranslate2():
+    # faster-whisper no depende de torch: se pregunta a CTranslate2 por las GPU CUDA.
+    import ctranslate2
+    return "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+
+# El modelo se carga una sola vez por proceso y se reutiliza en cada transcripción.
+# Se prefiere faster-whisper (CTranslate2) y, si no está instalado,
+# se usa openai-whisper.
+@functools.lru_cache(maxsize=1)
+def _cargar_modelo(nombre="base"):
+    print("Cargando el modelo Whisper (esto puede tardar la primera vez)...")
+    try:
+        from faster_whisper import WhisperModel
+    except ImportError:
+        import whisper
+        dispositivo = _dispositivo_torch()
+        return whisper.load_model(nombre, device=dispositivo), False, dispositivo
+    dispositivo = _dispositivo_ctranslate2()
+    compute_type = "float16" if dispositivo == "cuda" else "int8"
+    return WhisperModel(nombre, device=dispositivo, compute_type=compute_type), True, dispositivo
+
 def transcribir_audio(ruta_audio):
     if not os.path.exists(ruta_audio):
         print(f"Error: El archivo de audio no se encontró en '{ruta_audio}'")
         return ""
 
     # try: # Comenta esta línea
-    print("Cargando el modelo Whisper (esto puede tardar la primera vez)...")
-    model = whisper.load_model("base")
-    print("Modelo Whisper cargado. Transcribiendo audio...")
-
-    result = model.transcribe(ruta_audio)
+    model, es_faster_whisper, dispositivo = _cargar_modelo()
+    print(f"Modelo Whisper cargado ({dispositivo}). Transcribiendo audio...")
 
-    transcripcion = result["text"]
+    if es_faster_whisper:
+        segments, _ = model.transcribe(ruta_audio)
+        transcripcion = "".join(segment.text for segment in segments)
+    else:
+        result = model.transcribe(ruta_audio, fp16=(dispositivo == "cuda"))
+        transcripcion = result["text"]
     print("\n--- Transcripción Completa ---")
     print(transcripcion)
     return transcripcion
@@ -31,4 +62,4 @@ if __name__ == "__main__":
     if transcripcion_final:
         with open("transcripcion.txt", "w", encoding="utf-8") as f:
             f.write(transcripcion_final)
-        print("\nTranscripción guardada en 'transcripcion.txt'")
\ No newline at end of file
+        print("\nTranscripción guardada en 'transcripcion.txt'")